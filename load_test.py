@@ -0,0 +1,322 @@
+# load_test.py
+"""
+Load Test Harness - Digital Reliability Assistant
+
+Mensimulasikan N sesi teknisi yang bersamaan mengisi Field Measurement Data
+dan menekan tombol "RUN COMPLETE DIAGNOSIS" di render_mechanical_page().
+
+Per level konkurensi harness menjalankan SATU server asli
+(`streamlit run main.py --server.headless true`) lalu membuka N sesi websocket
+ke server itu, persis seperti N browser. Semua sesi berbagi satu proses server
+(thread script per sesi, GIL, memori), jadi hasilnya = kapasitas server.
+
+Output per level konkurensi:
+- p50 / p95 / p99 latency rerun (detik, klik RUN -> script_finished)
+- kenaikan RSS puncak proses server per sesi selama run (MiB, Linux /proc)
+- level konkurensi di mana latency server mulai degradasi
+
+Catatan: driver websocket berjalan di mesin yang sama dengan server dan ikut
+memakai CPU (kecil: hanya parsing protobuf). Angka bergantung jumlah core mesin.
+
+Contoh:
+    python load_test.py --sessions 1 2 4 8 16 32 --reruns 5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import websockets
+from streamlit.proto.Alert_pb2 import Alert
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.NumberInput_pb2 import NumberInput
+
+APP_FILE = str(Path(__file__).with_name("main.py"))
+RUN_BUTTON_LABEL = "🚀 RUN COMPLETE DIAGNOSIS"
+
+# Widget dengan key (lihat input_block() & Peak Picking di mechanical.py)
+SIDE_FIELDS = {
+    "v_de": (0.5, 9.0), "v_nde": (0.5, 9.0),
+    "a_de": (0.1, 3.0), "a_nde": (0.1, 3.0),
+    "d_de": (5.0, 150.0), "d_nde": (5.0, 150.0),
+    "t_de": (35.0, 95.0), "t_nde": (35.0, 95.0),
+}
+
+# Widget tanpa key -> dicari berdasarkan label
+PROCESS_FIELDS = {
+    "Suction Press (BarG)": (-0.2, 1.5),
+    "Discharge Press (BarG)": (3.0, 6.0),
+    "Actual Flow Reading": (50.0, 130.0),
+}
+
+
+def percentile(values, pct):
+    """Percentile dengan interpolasi linear (setara numpy 'linear')."""
+    if not values: return 0.0
+    data = sorted(values)
+    pos = (len(data) - 1) * pct / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(data) - 1)
+    return data[lo] + (data[hi] - data[lo]) * (pos - lo)
+
+
+# ==========================================
+# SERVER (streamlit run headless)
+# ==========================================
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(timeout):
+    """Jalankan `streamlit run main.py` headless. Return (proses, port)."""
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_FILE,
+         "--server.headless", "true", "--server.port", str(port),
+         "--server.address", "127.0.0.1", "--browser.gatherUsageStats", "false"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("Server streamlit berhenti saat start.")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return proc, port
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("Server streamlit tidak siap dalam batas timeout.")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def server_rss(pid):
+    """RSS proses server (byte) dari /proc. None jika bukan Linux."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+# ==========================================
+# SESI BROWSER (WEBSOCKET)
+# ==========================================
+
+class BrowserSession:
+    """Satu tab browser: koneksi websocket + state widget yang dikirim tiap rerun."""
+
+    def __init__(self, port, timeout):
+        self.url = f"ws://127.0.0.1:{port}/_stcore/stream"
+        self.timeout = timeout
+        self.ws = None
+        self.widgets = {}  # (label, key prefix) / key -> (id, data_type)
+        self.button_id = None
+
+    async def connect(self):
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        await self._rerun([])  # Page load pertama
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def _rerun(self, widget_states):
+        """Kirim rerun_script lalu tunggu script_finished. Return latency (detik)."""
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        msg.rerun_script.widget_states.widgets.extend(widget_states)
+
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await asyncio.wait_for(self.ws.recv(), self.timeout))
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                self._on_element(fwd.delta.new_element)
+            elif kind == "script_finished":
+                if fwd.script_finished == ForwardMsg.FINISHED_SUCCESSFULLY:
+                    return time.perf_counter() - start
+                if fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    raise RuntimeError(f"Script gagal: status {fwd.script_finished}")
+
+    def _on_element(self, element):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            raise RuntimeError(f"Exception di app: {element.exception.message}")
+        if kind == "alert" and element.alert.format == Alert.ERROR:
+            raise RuntimeError(f"Error di app: {element.alert.body}")
+        if kind == "number_input":
+            widget = element.number_input
+            self.widgets[widget.label] = (widget.id, widget.data_type)
+            # Widget berlabel sama (driver / driven) dibedakan dari key di akhir ID
+            for prefix in ("m", "p"):
+                for name in SIDE_FIELDS:
+                    if widget.id.endswith(f"-{prefix}_{name}"):
+                        self.widgets[f"{prefix}_{name}"] = (widget.id, widget.data_type)
+            for i in range(1, 4):
+                for key in (f"pf_{i}", f"pa_{i}"):
+                    if widget.id.endswith(f"-{key}"):
+                        self.widgets[key] = (widget.id, widget.data_type)
+        elif kind == "button" and element.button.label == RUN_BUTTON_LABEL:
+            self.button_id = element.button.id
+
+    def _value(self, name, value):
+        widget_id, data_type = self.widgets[name]
+        state = BackMsg().rerun_script.widget_states.widgets.add()
+        state.id = widget_id
+        if data_type == NumberInput.INT:
+            state.int_value = int(round(value))
+        else:
+            state.double_value = float(value)
+        return state
+
+    async def run_diagnosis(self, rng):
+        """Satu siklus user: isi input lalu klik RUN. Return latency rerun (detik)."""
+        states = []
+        for prefix in ("m", "p"):
+            for name, (lo, hi) in SIDE_FIELDS.items():
+                states.append(self._value(f"{prefix}_{name}", round(rng.uniform(lo, hi), 2)))
+        for label, (lo, hi) in PROCESS_FIELDS.items():
+            states.append(self._value(label, round(rng.uniform(lo, hi), 2)))
+        for i in range(1, 4):
+            states.append(self._value(f"pf_{i}", round(rng.uniform(10.0, 250.0), 1)))
+            states.append(self._value(f"pa_{i}", round(rng.uniform(0.1, 6.0), 2)))
+
+        if self.button_id is None:
+            raise LookupError(f"button '{RUN_BUTTON_LABEL}' tidak ditemukan")
+        click = BackMsg().rerun_script.widget_states.widgets.add()
+        click.id = self.button_id
+        click.trigger_value = True
+        return await self._rerun(states + [click])
+
+
+# ==========================================
+# SKENARIO LOAD TEST
+# ==========================================
+
+async def _drive_level(port, pid, n_sessions, reruns, timeout, seed):
+    # Warm-up: import modul & compile script pertama tidak dihitung
+    warmup = BrowserSession(port, timeout)
+    await warmup.connect()
+    await warmup.run_diagnosis(random.Random(seed - 1))
+    await warmup.close()
+    await asyncio.sleep(1.0)
+    rss_before = server_rss(pid)
+
+    sessions = [BrowserSession(port, timeout) for _ in range(n_sessions)]
+    await asyncio.gather(*(s.connect() for s in sessions))
+
+    async def user(idx, session):
+        rng = random.Random(seed + idx)
+        return [await session.run_diagnosis(rng) for _ in range(reruns)]
+
+    rss_peak = rss_before
+
+    async def sample_rss():
+        nonlocal rss_peak
+        while True:
+            rss = server_rss(pid)
+            if rss is not None and rss_peak is not None:
+                rss_peak = max(rss_peak, rss)
+            await asyncio.sleep(0.05)
+
+    # Semua sesi klik RUN pada saat yang sama (shift change)
+    sampler = asyncio.create_task(sample_rss())
+    start = time.perf_counter()
+    results = await asyncio.gather(*(user(i, s) for i, s in enumerate(sessions)))
+    wall = time.perf_counter() - start
+    sampler.cancel()
+    await asyncio.gather(*(s.close() for s in sessions))
+
+    per_session = None
+    if rss_before is not None:
+        per_session = (rss_peak - rss_before) / n_sessions
+    return [lat for session in results for lat in session], wall, per_session
+
+
+def run_level(n_sessions, reruns, timeout, seed):
+    """Satu server baru per level agar memori & cache antar level tidak tercampur."""
+    proc, port = start_server(timeout)
+    try:
+        latencies, wall, per_session = asyncio.run(
+            _drive_level(port, proc.pid, n_sessions, reruns, timeout, seed))
+    finally:
+        stop_server(proc)
+
+    return {
+        "sessions": n_sessions,
+        "runs": len(latencies),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "throughput": len(latencies) / wall if wall > 0 else 0.0,
+        "rss_mib": per_session / 2**20 if per_session is not None else None,
+    }
+
+
+def find_degradation(levels, factor):
+    """Level konkurensi pertama di mana p95 > factor x p95 baseline (level terkecil)."""
+    if not levels: return None
+    base_p95 = levels[0]["p95"]
+    for level in levels[1:]:
+        if level["p95"] > base_p95 * factor:
+            return level["sessions"]
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test untuk render_mechanical_page")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32],
+                        help="Level konkurensi yang diuji (jumlah sesi bersamaan)")
+    parser.add_argument("--reruns", type=int, default=5, help="Jumlah klik RUN per sesi")
+    parser.add_argument("--degrade-factor", type=float, default=2.0,
+                        help="Latency dianggap degradasi jika p95 > factor x p95 baseline")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Timeout start server & per rerun (detik)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    print(f"{'Sessions':>8} {'Runs':>6} {'p50 (s)':>9} {'p95 (s)':>9} {'p99 (s)':>9} {'Runs/s':>8} {'Peak RSS/sesi (MiB)':>19}")
+
+    levels = []
+    for n in sorted(set(args.sessions)):
+        level = run_level(n, args.reruns, args.timeout, args.seed)
+        levels.append(level)
+        rss = f"{level['rss_mib']:.2f}" if level["rss_mib"] is not None else "n/a"
+        print(f"{level['sessions']:>8} {level['runs']:>6} {level['p50']:>9.3f} {level['p95']:>9.3f} "
+              f"{level['p99']:>9.3f} {level['throughput']:>8.1f} {rss:>19}")
+
+    knee = find_degradation(levels, args.degrade_factor)
+    print()
+    print(f"Host: {os.cpu_count()} core (server + driver websocket di mesin yang sama)")
+    if knee is None:
+        print(f"Latency server tidak degradasi (> {args.degrade_factor}x p95 baseline) sampai {levels[-1]['sessions']} sesi.")
+    else:
+        print(f"Latency server mulai degradasi pada {knee} sesi bersamaan (p95 > {args.degrade_factor}x baseline).")
+
+
+if __name__ == "__main__":
+    main()
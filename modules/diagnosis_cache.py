@@ -0,0 +1,185 @@
+# modules/diagnosis_cache.py
+"""
+Cache hasil diagnosa (shared) untuk pembacaan steady-state.
+
+Key = input yang dikuantisasi ke resolusi alat ukur + parameter rated aset + threshold inspector.
+Kebijakan: LRU (maxsize) + TTL opsional, dengan counter hit/miss.
+Per tag aset disimpan beberapa fingerprint (threshold + record aset) yang aktif; fingerprint
+yang sudah lama tidak dipakai (threshold / aset berubah) dibuang beserta entrinya.
+Input NaN/inf (data historian kosong) tidak di-cache: langsung dihitung tanpa cache.
+
+Dipakai di UI maupun batch: DEFAULT_CACHE adalah objek level-modul, jadi di Streamlit
+dibagi oleh semua sesi (thread-safe). Nilai yang disimpan harus immutable (tuple /
+MappingProxyType), jadi satu sesi tidak bisa mengubah laporan sesi lain.
+
+Hanya ElectricalInspector.analyze_health() yang di-cache. HydraulicInspector.analyze_performance()
+dan assess_overall_health() hanya beberapa µs: biaya key + lookup lebih mahal dari hitung ulang.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
+# Resolusi alat ukur (satuan input)
+RESOLUTION = {
+    "voltage": 0.1,   # V  (multimeter / power analyzer)
+    "current": 0.1,   # A  (clamp meter)
+}
+
+
+def quantize(values, resolution):
+    """Nilai (atau list nilai) -> integer step resolusi (stabil sebagai key). NaN/inf -> None."""
+    if isinstance(values, (list, tuple)):
+        return tuple(quantize(v, resolution) for v in values)
+    if not math.isfinite(values): return None
+    return int(round(values / resolution))
+
+
+def _cacheable(*keys):
+    """False jika ada input non-finite (None) -> bypass cache."""
+    for key in keys:
+        if key is None or (isinstance(key, tuple) and None in key):
+            return False
+    return True
+
+
+def dequantize(steps, resolution):
+    """Kebalikan quantize(): perhitungan memakai nilai terkuantisasi agar hasil = key."""
+    if isinstance(steps, tuple):
+        return [round(s * resolution, 6) for s in steps]
+    return round(steps * resolution, 6)
+
+
+def fingerprint(obj):
+    """Snapshot atribut skalar objek (threshold inspector / record aset)."""
+    if obj is None: return None
+    scalar = (int, float, str, bool, tuple, type(None))
+    return tuple(sorted((k, v) for k, v in vars(obj).items() if isinstance(v, scalar)))
+
+
+class DiagnosisCache:
+    """LRU + TTL cache untuk hasil diagnosa (nilai immutable, dikembalikan apa adanya)."""
+
+    def __init__(self, maxsize=1024, ttl=None, max_fingerprints=8):
+        self.maxsize = maxsize
+        self.ttl = ttl  # detik, None = tanpa kadaluarsa
+        self.max_fingerprints = max_fingerprints # Fingerprint aktif per (namespace, tag aset)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypassed = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._scopes = {}           # (namespace, scope) -> OrderedDict fingerprint aktif (LRU)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get_or_compute(self, namespace, scope, fp, inputs, compute):
+        """
+        namespace: nama fungsi diagnosa ("electrical", ...)
+        scope    : tag aset (unit invalidasi)
+        fp       : fingerprint threshold + record aset
+        inputs   : tuple input terkuantisasi
+        compute  : callable tanpa argumen, dipanggil saat miss; hasilnya harus immutable
+        """
+        key = (namespace, scope, fp, inputs)
+        now = time.monotonic()
+        with self._lock:
+            live = self._scopes.setdefault((namespace, scope), OrderedDict())
+            live[fp] = None
+            live.move_to_end(fp)
+            while len(live) > self.max_fingerprints:
+                old_fp, _ = live.popitem(last=False) # Threshold / aset lama yang tidak dipakai lagi
+                self._drop(namespace, scope, old_fp)
+
+            entry = self._data.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > now):
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key] # Kadaluarsa (TTL)
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            expires_at = now + self.ttl if self.ttl is not None else None
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def bypass(self, compute):
+        """Hitung tanpa cache (input non-finite)."""
+        with self._lock:
+            self.bypassed += 1
+        return compute()
+
+    def _drop(self, namespace=None, scope=None, fp=None):
+        for key in [k for k in self._data
+                    if (namespace is None or k[0] == namespace) and (scope is None or k[1] == scope)
+                    and (fp is None or k[2] == fp)]:
+            del self._data[key]
+
+    def invalidate(self, namespace=None, scope=None):
+        """Buang entri manual (misal setelah edit database aset). Tanpa argumen = semua."""
+        with self._lock:
+            self._drop(namespace, scope)
+            for k in [k for k in self._scopes
+                      if (namespace is None or k[0] == namespace) and (scope is None or k[1] == scope)]:
+                del self._scopes[k]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bypassed": self.bypassed,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+DEFAULT_CACHE = DiagnosisCache()
+
+
+def _scope(asset):
+    return asset.tag if asset is not None else "-"
+
+
+def _freeze_health(result):
+    """(df, faults, status, load_pct) -> bentuk immutable untuk disimpan di cache."""
+    df, faults, status, load_pct = result
+    return df, tuple(MappingProxyType(dict(f)) for f in faults), status, load_pct
+
+
+def electrical_health(inspector, vol_inputs, amp_inputs, rated_vol, rated_fla, asset=None, cache=None):
+    """
+    Cached ElectricalInspector.analyze_health() -> (df, faults, status, load_pct)
+    faults = tuple MappingProxyType (read-only); df = salinan milik pemanggil.
+    """
+    cache = cache if cache is not None else DEFAULT_CACHE
+    q_vol = quantize(tuple(vol_inputs), RESOLUTION["voltage"])
+    q_amp = quantize(tuple(amp_inputs), RESOLUTION["current"])
+
+    if not _cacheable(q_vol, q_amp):
+        return cache.bypass(lambda: inspector.analyze_health(vol_inputs, amp_inputs, rated_vol, rated_fla))
+
+    def compute():
+        return _freeze_health(inspector.analyze_health(dequantize(q_vol, RESOLUTION["voltage"]),
+                                                       dequantize(q_amp, RESOLUTION["current"]),
+                                                       rated_vol, rated_fla))
+
+    fp = (fingerprint(inspector), fingerprint(asset))
+    df, faults, status, load_pct = cache.get_or_compute(
+        "electrical", _scope(asset), fp, (q_vol, q_amp, rated_vol, rated_fla), compute)
+    return df.copy(), faults, status, load_pct
@@ -47,25 +47,368 @@ def analyze_hydraulic_performance(suc_bar, dis_bar, design_head_m, actual_flow_m
         
     return messages if messages else ["🟢 Hydraulic Normal"]
 
+def classify_order(order):
+    """Order band -> diagnosa. Dipakai spektrum Hz (nameplate RPM) & spektrum order (VFD)."""
+    if 0.8 <= order <= 1.2: return "UNBALANCE (1x RPM)"
+    elif 1.8 <= order <= 2.2: return "MISALIGNMENT (2x RPM)"
+    elif 2.8 <= order <= 3.2: return "LOOSENESS (3x RPM)"
+    elif order > 3.5: return "BEARING DEFECT (High Freq)"
+    return None
+
 def analyze_spectrum_logic(rpm, peaks):
     """Jalur D: Root Cause Analysis (Spectrum)"""
     if rpm == 0 or not peaks: return ["Data Spektrum Kosong"]
     run_speed_hz = rpm / 60
+    order_peaks = [{'order': p['freq'] / run_speed_hz, 'amp': p['amp']} for p in peaks]
+    return analyze_order_spectrum_logic(order_peaks)
+
+def analyze_order_spectrum_logic(order_peaks):
+    """Jalur D (VFD): Root Cause Analysis dari puncak spektrum order"""
+    if not order_peaks: return ["Data Spektrum Kosong"]
     diagnosis = []
-    max_amp = max([p['amp'] for p in peaks])
+    max_amp = max([p['amp'] for p in order_peaks])
     
-    for peak in peaks:
-        f, a = peak['freq'], peak['amp']
+    for peak in order_peaks:
+        order, a = peak['order'], peak['amp']
         if a < 0.3 or (a < 0.1 * max_amp): continue
-        order = f / run_speed_hz
-        
-        if 0.8 <= order <= 1.2: diagnosis.append("UNBALANCE (1x RPM)")
-        elif 1.8 <= order <= 2.2: diagnosis.append("MISALIGNMENT (2x RPM)")
-        elif 2.8 <= order <= 3.2: diagnosis.append("LOOSENESS (3x RPM)")
-        elif order > 3.5: diagnosis.append("BEARING DEFECT (High Freq)")
+        label = classify_order(order)
+        if label: diagnosis.append(label)
             
     return list(set(diagnosis)) if diagnosis else ["Spectrum Normal"]
 
+# ==========================================
+# BAGIAN A2: ORDER TRACKING (POMPA VFD)
+# ==========================================
+
+class OrderTracker:
+    """
+    Computed Order Tracking untuk pompa variable speed (VFD).
+
+    1. Estimasi kecepatan sesaat dari kanal tacho (pulse) ATAU tracking puncak 1x (STFT).
+    2. Resample waveform dari domain waktu ke domain sudut (np.interp) -> sampel per putaran konstan.
+    3. FFT per blok sudut (rata-rata daya) -> spektrum order (sumbu X = kelipatan RPM).
+
+    Data diumpankan per chunk lewat feed(), buffer internal hanya menyimpan sisa chunk
+    sebelumnya (<= 1 frame STFT / 1 putaran), jadi memori tetap terbatas untuk rekaman panjang.
+    Syarat: fs >= 2 x (samples_per_rev / 2) x speed maksimum; konten di atas order
+    samples_per_rev / 2 harus sudah difilter (anti-aliasing) sebelum diumpankan.
+    """
+
+    def __init__(self, fs, rpm, ppr=1, tach_threshold=None, tach_min_swing=0.5, tach_hysteresis=0.2,
+                 samples_per_rev=64, revs_per_block=32, speed_range=(0.3, 1.2), track_tol=0.1,
+                 subharmonic_snr=6.0, subharmonic_min_ratio=0.15):
+        """
+        fs              : sampling rate waveform (Hz)
+        rpm             : RPM nameplate (acuan band pencarian 1x)
+        ppr             : pulsa tacho per putaran
+        tach_threshold  : level trigger tacho (default: tengah min-max chunk pertama yang berpulsa)
+        tach_min_swing  : swing tacho minimum (satuan kanal tacho) agar chunk dianggap berpulsa
+        tach_hysteresis : lebar hysteresis trigger (fraksi swing), anti double-trigger noise
+        speed_range     : rentang speed VFD relatif nameplate (misal 30% - 120%)
+        track_tol       : perubahan speed maksimum antar frame STFT (fraksi)
+        subharmonic_snr : puncak di f/2 atau f/3 dianggap ada jika > snr x noise floor band
+        subharmonic_min_ratio : puncak f/2 atau f/3 minimal fraksi ini dari puncak band agar dipakai sebagai 1x
+        """
+        self.fs = float(fs)
+        self.nominal_hz = rpm / 60
+        self.ppr = ppr
+        self.tach_threshold = tach_threshold
+        self.tach_min_swing = tach_min_swing
+        self.tach_hysteresis = tach_hysteresis
+        self.subharmonic_snr = subharmonic_snr
+        self.subharmonic_min_ratio = subharmonic_min_ratio
+        self.samples_per_rev = samples_per_rev
+        self.block_len = samples_per_rev * revs_per_block
+        self.speed_range = speed_range
+        self.track_tol = track_tol
+
+        # STFT 1x tracking: resolusi bin <= 1/8 speed minimum (lalu interpolasi parabolik)
+        min_speed_hz = speed_range[0] * self.nominal_hz
+        self.nfft = int(2 ** np.ceil(np.log2(8 * self.fs / min_speed_hz)))
+        self.hop = self.nfft // 4
+        self._stft_window = np.hanning(self.nfft)
+        self._block_window = np.hanning(self.block_len)
+
+        # Tacho hilang > 10 putaran (pada speed minimum) = pompa berhenti -> reset tracking
+        self.max_gap = int(10 * self.fs / min_speed_hz)
+
+        self._use_tach = None
+        self._x = np.empty(0)
+        self._tach = np.empty(0)
+        self._buf_start = 0      # index global sampel _x[0]
+        self._anchor_t = np.empty(0)   # index sampel (pecahan) titik acuan
+        self._anchor_rev = np.empty(0) # posisi poros (putaran) di titik acuan
+        self._edge_count = 0
+        self._tach_levels = None # (low, high) trigger Schmitt
+        self.skipped_chunks = 0  # Chunk tacho dengan speed di luar speed_range
+        self.lock_ambiguous = False # Lock 1x tanpa tacho tidak pasti (ada sub-harmonik yang tidak konsisten)
+        self._next_center = self.nfft // 2
+        self._last_speed = None
+        self._next_j = None      # index grid sudut berikutnya (putaran = j / samples_per_rev)
+        self._ang = np.empty(0)  # sampel sudut yang belum cukup 1 blok
+
+        self._spec_sum = np.zeros(self.block_len // 2 + 1)
+        self._n_blocks = 0
+        self._run_revs = 0.0
+        self._run_samples = 0.0
+        self._speed_min = np.inf
+        self._speed_max = 0.0
+
+    def feed(self, x, tach=None):
+        """Umpankan satu chunk waveform (dan chunk tacho dengan panjang sama, jika ada)."""
+        x = np.asarray(x, dtype=np.float64)
+        if self._use_tach is None:
+            self._use_tach = tach is not None
+        if self._use_tach != (tach is not None):
+            raise ValueError("Kanal tacho harus diberikan di semua chunk atau tidak sama sekali.")
+
+        self._x = np.concatenate([self._x, x])
+        if self._use_tach:
+            tach = np.asarray(tach, dtype=np.float64)
+            if len(tach) != len(x):
+                raise ValueError("Panjang chunk tacho harus sama dengan chunk waveform.")
+            swing = tach.max() - tach.min()
+            if self._tach_levels is None and swing >= self.tach_min_swing:
+                # Threshold baru ditentukan setelah ada pulsa (pompa mungkin belum jalan di awal rekaman)
+                center = self.tach_threshold if self.tach_threshold is not None else tach.min() + 0.5 * swing
+                half = 0.5 * self.tach_hysteresis * swing
+                self._tach_levels = (center - half, center + half)
+            self._tach = np.concatenate([self._tach, tach])
+            new_t, new_rev = self._tach_anchors()
+            if not self._speed_in_range(new_t, new_rev):
+                self.skipped_chunks += 1
+                self._reset_tracking()
+                new_t, new_rev = np.empty(0), np.empty(0)
+        else:
+            new_t, new_rev = self._peak_anchors()
+
+        self._add_anchors(new_t, new_rev)
+        self._resample()
+
+        buf_end = self._buf_start + len(self._x)
+        if self._use_tach and len(self._anchor_t) and buf_end - self._anchor_t[-1] > self.max_gap:
+            self._reset_tracking()
+        self._trim()
+
+    def _tach_anchors(self):
+        """Rising edge tacho (Schmitt trigger) -> (waktu pecahan, putaran). Satu edge = 1/ppr putaran."""
+        if self._tach_levels is None: return np.empty(0), np.empty(0)
+        tach = self._tach
+        low, high = self._tach_levels
+
+        # State: +1 di atas high, -1 di bawah low, di antara keduanya ikut state terakhir
+        state = np.where(tach >= high, 1, np.where(tach <= low, -1, 0))
+        last = np.maximum.accumulate(np.where(state != 0, np.arange(len(state)), 0))
+        state = np.where(state[last] != 0, state[last], 0)
+        idx = np.flatnonzero((state[:-1] == -1) & (state[1:] == 1)) + 1
+        frac = (high - tach[idx - 1]) / (tach[idx] - tach[idx - 1])
+        t = self._buf_start + idx - 1 + frac
+        if len(self._anchor_t):
+            t = t[t > self._anchor_t[-1] + 0.5] # Edge yang sudah tercatat di chunk sebelumnya
+        revs = (self._edge_count + np.arange(len(t))) / self.ppr
+        self._edge_count += len(t)
+        return t, revs
+
+    def _speed_in_range(self, new_t, new_rev):
+        """Speed sesaat dari titik acuan baru harus di dalam speed_range (toleransi 10%)."""
+        t = np.concatenate([self._anchor_t[-1:], new_t])
+        rev = np.concatenate([self._anchor_rev[-1:], new_rev])
+        if len(t) < 2: return True
+        speed = np.diff(rev) / np.diff(t) * self.fs
+        lo = 0.9 * self.speed_range[0] * self.nominal_hz
+        hi = 1.1 * self.speed_range[1] * self.nominal_hz
+        return bool(np.all((speed >= lo) & (speed <= hi)))
+
+    def _refine_peak(self, row, kk, df):
+        """Interpolasi parabolik (log-magnitude) untuk presisi sub-bin -> frekuensi (Hz)."""
+        a, b, c = np.log(row[kk - 1:kk + 2] + 1e-12)
+        denom = a - 2 * b + c
+        delta = float(np.clip(0.5 * (a - c) / denom, -0.5, 0.5)) if denom != 0 else 0.0
+        return (kk + delta) * df
+
+    def _band_peak(self, row, target, df):
+        """Index bin puncak terbesar di sekitar target (Hz, +/-3%). None jika di luar spektrum."""
+        width = max(2, int(np.ceil(0.03 * target / df)))
+        lo = max(int(round(target / df)) - width, 1)
+        hi = min(int(round(target / df)) + width, len(row) - 2)
+        if hi < lo: return None
+        return lo + int(np.argmax(row[lo:hi + 1]))
+
+    def _lock_fundamental(self, row, f, df, b0, b1):
+        """
+        Lock awal 1x: band pencarian lebar (4:1) juga memuat 2x / 3x saat speed rendah.
+        Kandidat f/3 atau f/2 baru dipakai sebagai 1x jika deret harmoniknya konsisten:
+        - puncak kandidat > snr x noise floor band dan >= subharmonic_min_ratio x puncak band
+        - harmonik lain kandidat juga ada (3x kandidat untuk f/2, 2x kandidat untuk f/3)
+        Kasus misalignment (2x > 1x) ter-lock ke 1x, sedangkan komponen 0.5x kecil
+        (rub / oil whirl) pada pompa 1x-dominan tidak menggeser lock.
+        Sub-harmonik nyata yang tidak lolos syarat -> lock_ambiguous (pakai tacho).
+        """
+        floor = np.median(row[b0:b1 + 1])
+        peak = row[int(round(f / df))]
+        for n, other in ((3, 2), (2, 3)):
+            target = f / n
+            if target < 0.9 * self.speed_range[0] * self.nominal_hz: continue
+            kk = self._band_peak(row, target, df)
+            if kk is None or row[kk] <= self.subharmonic_snr * floor: continue
+            cand = self._refine_peak(row, kk, df)
+            hk = self._band_peak(row, other * cand, df)
+            consistent = hk is not None and row[hk] > self.subharmonic_snr * floor
+            if row[kk] >= self.subharmonic_min_ratio * peak and consistent:
+                return cand
+            self.lock_ambiguous = True
+        return f
+
+    def _peak_anchors(self):
+        """Tracking puncak 1x per frame STFT -> speed sesaat, diintegrasi jadi putaran."""
+        first = self._next_center - self.nfft // 2 - self._buf_start
+        avail = len(self._x) - first
+        if avail < self.nfft: return np.empty(0), np.empty(0)
+
+        n_frames = 1 + (avail - self.nfft) // self.hop
+        span = self._x[first:first + self.nfft + (n_frames - 1) * self.hop]
+        frames = np.lib.stride_tricks.sliding_window_view(span, self.nfft)[::self.hop]
+        spec = np.abs(np.fft.rfft(frames * self._stft_window, axis=1))
+
+        df = self.fs / self.nfft
+        band_lo = self.speed_range[0] * self.nominal_hz
+        band_hi = self.speed_range[1] * self.nominal_hz
+        speeds = np.empty(n_frames)
+        prev = self._last_speed
+        for k in range(n_frames):
+            lo, hi = band_lo, band_hi
+            if prev is not None:
+                lo, hi = max(lo, prev * (1 - self.track_tol)), min(hi, prev * (1 + self.track_tol))
+            b0 = max(int(np.ceil(lo / df)), 1)
+            b1 = max(min(int(np.floor(hi / df)), spec.shape[1] - 2), b0)
+            kk = b0 + int(np.argmax(spec[k, b0:b1 + 1]))
+            f = self._refine_peak(spec[k], kk, df)
+            if prev is None:
+                f = self._lock_fundamental(spec[k], f, df, b0, b1)
+            prev = speeds[k] = f
+
+        centers = self._next_center + self.hop * np.arange(n_frames, dtype=np.float64)
+        dt = self.hop / self.fs
+        if self._last_speed is None:
+            revs = np.concatenate([[0.0], np.cumsum(0.5 * (speeds[1:] + speeds[:-1]) * dt)])
+        else:
+            prev_speeds = np.concatenate([[self._last_speed], speeds[:-1]])
+            revs = self._anchor_rev[-1] + np.cumsum(0.5 * (prev_speeds + speeds) * dt)
+
+        self._next_center += n_frames * self.hop
+        self._last_speed = speeds[-1]
+        return centers, revs
+
+    def _add_anchors(self, new_t, new_rev):
+        if not len(new_t): return
+        t = np.concatenate([self._anchor_t[-1:], new_t])
+        rev = np.concatenate([self._anchor_rev[-1:], new_rev])
+        if len(t) > 1:
+            speed = np.diff(rev) / np.diff(t) * self.fs
+            self._speed_min = min(self._speed_min, speed.min())
+            self._speed_max = max(self._speed_max, speed.max())
+            self._run_revs += rev[-1] - rev[0]
+            self._run_samples += t[-1] - t[0]
+        self._anchor_t = np.concatenate([self._anchor_t, new_t])
+        self._anchor_rev = np.concatenate([self._anchor_rev, new_rev])
+
+    def _resample(self):
+        """Sampel waktu di antara titik acuan -> grid sudut seragam -> blok FFT."""
+        if len(self._anchor_t) < 2: return
+        lo = max(self._buf_start, int(np.ceil(self._anchor_t[0])))
+        hi = int(np.floor(self._anchor_t[-1]))
+        if hi < lo: return
+
+        idx = np.arange(lo, hi + 1, dtype=np.float64)
+        sample_revs = np.interp(idx, self._anchor_t, self._anchor_rev)
+        samples = self._x[lo - self._buf_start:hi + 1 - self._buf_start]
+
+        if self._next_j is None:
+            self._next_j = int(np.ceil(sample_revs[0] * self.samples_per_rev))
+        j_end = int(np.floor(sample_revs[-1] * self.samples_per_rev))
+        if j_end < self._next_j: return
+
+        grid = np.arange(self._next_j, j_end + 1) / self.samples_per_rev
+        self._ang = np.concatenate([self._ang, np.interp(grid, sample_revs, samples)])
+        self._next_j = j_end + 1
+
+        n_blocks = len(self._ang) // self.block_len
+        if n_blocks:
+            blocks = self._ang[:n_blocks * self.block_len].reshape(n_blocks, self.block_len)
+            blocks = blocks - blocks.mean(axis=1, keepdims=True)
+            amp = np.abs(np.fft.rfft(blocks * self._block_window, axis=1))
+            self._spec_sum += (amp ** 2).sum(axis=0)
+            self._n_blocks += n_blocks
+            self._ang = self._ang[n_blocks * self.block_len:]
+
+    def _reset_tracking(self):
+        """Pompa berhenti / tacho hilang: mulai segmen baru (blok yang belum penuh dibuang)."""
+        self._anchor_t = np.empty(0)
+        self._anchor_rev = np.empty(0)
+        self._next_j = None
+        self._ang = np.empty(0)
+
+    def _trim(self):
+        """Buang sampel yang sudah tidak dibutuhkan (memori terbatas)."""
+        buf_end = self._buf_start + len(self._x)
+        keep = int(np.floor(self._anchor_t[-1])) if len(self._anchor_t) else buf_end - 1
+        if not self._use_tach:
+            keep = min(keep, self._next_center - self.nfft // 2)
+        cut = keep - self._buf_start
+        if cut > 0:
+            self._x = self._x[cut:]
+            self._tach = self._tach[cut:]
+            self._buf_start = keep
+
+        if len(self._anchor_t) > 1:
+            i = max(int(np.searchsorted(self._anchor_t, self._buf_start, side="right")) - 1, 0)
+            self._anchor_t = self._anchor_t[i:]
+            self._anchor_rev = self._anchor_rev[i:]
+
+    def result(self):
+        """
+        Return dict:
+        - orders : sumbu order (1.0 = 1x RPM aktual)
+        - amp    : amplitudo RMS per order (satuan sama dengan waveform, misal mm/s)
+        - n_blocks, rpm_mean, rpm_min, rpm_max
+        - skipped_chunks : chunk tacho yang dibuang karena speed di luar speed_range
+        - lock_ambiguous : True jika lock 1x (tanpa tacho) tidak pasti -> ulangi pengukuran dengan tacho
+        """
+        if self._n_blocks == 0:
+            raise ValueError("Rekaman terlalu pendek / speed tidak terdeteksi untuk 1 blok order.")
+        scale = 2 / self._block_window.sum() / np.sqrt(2)
+        return {
+            "orders": np.fft.rfftfreq(self.block_len, d=1 / self.samples_per_rev),
+            "amp": np.sqrt(self._spec_sum / self._n_blocks) * scale,
+            "n_blocks": self._n_blocks,
+            "rpm_mean": self._run_revs / self._run_samples * self.fs * 60,
+            "rpm_min": self._speed_min * 60,
+            "rpm_max": self._speed_max * 60,
+            "skipped_chunks": self.skipped_chunks,
+            "lock_ambiguous": self.lock_ambiguous,
+        }
+
+def iter_chunks(signal, chunk_size=262144):
+    """Potong rekaman panjang (array / np.memmap / np.load(mmap_mode='r')) jadi chunk."""
+    for start in range(0, len(signal), chunk_size):
+        yield signal[start:start + chunk_size]
+
+def compute_order_spectrum(chunks, fs, rpm, tach_chunks=None, **kwargs):
+    """Jalur D (VFD): Order tracking dari iterable chunk waveform (+ tacho opsional)."""
+    tracker = OrderTracker(fs, rpm, **kwargs)
+    if tach_chunks is None:
+        for x in chunks: tracker.feed(x)
+    else:
+        for x, tach in zip(chunks, tach_chunks): tracker.feed(x, tach)
+    return tracker.result()
+
+def pick_order_peaks(orders, amp, n_peaks=3, min_order=0.5):
+    """Ambil n puncak lokal tertinggi dari spektrum order -> format untuk analyze_order_spectrum_logic."""
+    is_peak = (amp[1:-1] > amp[:-2]) & (amp[1:-1] >= amp[2:]) & (orders[1:-1] >= min_order)
+    idx = np.flatnonzero(is_peak) + 1
+    top = idx[np.argsort(amp[idx])[::-1][:n_peaks]]
+    return [{'order': float(orders[i]), 'amp': float(amp[i])} for i in top]
+
 # ==========================================
 # BAGIAN B: USER INTERFACE (UI)
 # ==========================================
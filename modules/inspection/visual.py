@@ -1,3 +1,13 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
 class VisualInspector:
     """
     Menangani standar:
@@ -6,6 +16,28 @@ class VisualInspector:
     3. ISO 45001 / OSHA 1910 (Safety)
     """
     
+    # Naikkan jika rumus fitur berubah -> cache lama otomatis tidak terpakai
+    FEATURE_VERSION = 1
+
+    def __init__(self, cache_dir=".oil_photo_cache"):
+        self.cache_dir = Path(cache_dir)
+
+        # Ukuran thumbnail (semua foto di-resize sama agar bisa diproses 1 batch)
+        self.thumb_size = (128, 128)
+        self.center_crop = 0.6 # Ambil 60% area tengah (botol sampel), buang background
+
+        # Threshold klasifikasi foto (skala 0-255 / 0-1).
+        # Dark/Milky: heuristik awal dari warna rata-rata botol sampel (belum dari foto berlabel):
+        # oli baru amber luma ~100-160, oli teroksidasi/hitam < 60, emulsi putih susu terang & tanpa warna.
+        self.dark_luma_max = 60.0     # Oli gelap/hitam (oksidasi)
+        self.milky_luma_min = 170.0   # Emulsi air: terang...
+        self.milky_sat_max = 0.15     # ...dan hampir tidak berwarna (putih susu)
+        # Clear vs Hazy: clarity mengukur tepi latar yang terlihat MENEMBUS botol, jadi foto wajib
+        # memakai latar bergaris/grid yang sama (tanpa latar, sampel jernih pun bernilai ~0).
+        # Nilainya tergantung kamera, jarak & latar -> None sampai di-set lewat calibrate();
+        # selama None, foto yang tidak Dark/Milky dilaporkan UNKNOWN.
+        self.hazy_clarity_min = None
+
     def analyze_oil_condition(self, visual_check):
         """
         Visual check mapping ke kemungkinan kode ISO 4406
@@ -20,6 +52,200 @@ class VisualInspector:
             return "CRITICAL", "ISO 4406: High Water Content (Emulsion)"
         return "UNKNOWN", "-"
 
+    def _load_thumbnail(self, data):
+        """Decode foto (bytes) -> array RGB uint8 ukuran thumb_size, area tengah saja."""
+        with Image.open(io.BytesIO(data)) as img:
+            img.draft("RGB", (self.thumb_size[0] * 4, self.thumb_size[1] * 4)) # Decode JPEG langsung di resolusi kecil
+            img = img.convert("RGB")
+            w, h = img.size
+            cw, ch = int(w * self.center_crop), int(h * self.center_crop)
+            left, top = (w - cw) // 2, (h - ch) // 2
+            img = img.crop((left, top, left + cw, top + ch)).resize(self.thumb_size, Image.BILINEAR)
+            return np.asarray(img, dtype=np.uint8)
+
+    def compute_photo_features(self, thumbs):
+        """
+        Fitur warna & turbiditas untuk batch thumbnail (N, H, W, 3), dihitung sekaligus.
+        - luma      : kecerahan rata-rata (ITU-R BT.601)
+        - saturation: kepekatan warna (0 = abu/putih, 1 = warna penuh)
+        - clarity   : ketajaman tepi relatif terhadap kecerahan. Oli keruh/emulsi
+                      menyebarkan cahaya sehingga tepi latar jadi blur (nilai kecil).
+        """
+        rgb = thumbs.astype(np.float32)
+        luma = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+        c_max = rgb.max(axis=-1)
+        c_min = rgb.min(axis=-1)
+        saturation = np.where(c_max > 0, (c_max - c_min) / np.maximum(c_max, 1e-6), 0.0)
+
+        grad_x = np.abs(np.diff(luma, axis=2)).mean(axis=(1, 2))
+        grad_y = np.abs(np.diff(luma, axis=1)).mean(axis=(1, 2))
+        luma_mean = luma.mean(axis=(1, 2))
+        clarity = (grad_x + grad_y) / np.maximum(luma_mean, 1.0)
+
+        mean_rgb = rgb.mean(axis=(1, 2))
+        return [
+            {
+                "r": float(mean_rgb[i, 0]), "g": float(mean_rgb[i, 1]), "b": float(mean_rgb[i, 2]),
+                "luma": float(luma_mean[i]),
+                "luma_std": float(luma[i].std()),
+                "saturation": float(saturation[i].mean()),
+                "clarity": float(clarity[i]),
+            }
+            for i in range(len(thumbs))
+        ]
+
+    def classify_oil_photo(self, features):
+        """Fitur foto -> kategori visual yang sama dengan input manual."""
+        if features["luma"] < self.dark_luma_max:
+            return "Dark/Black"
+        if features["luma"] >= self.milky_luma_min and features["saturation"] <= self.milky_sat_max:
+            return "Milky"
+        if self.hazy_clarity_min is None:
+            return "UNKNOWN" # Clarity belum dikalibrasi (lihat calibrate())
+        if features["clarity"] < self.hazy_clarity_min:
+            return "Cloudy/Hazy"
+        return "Clear & Bright"
+
+    def calibrate(self, labelled):
+        """
+        Kalibrasi hazy_clarity_min dari foto berlabel (setup kamera + latar grid yang sama dengan inspeksi).
+        labelled: list (path foto, "Clear & Bright" / "Cloudy/Hazy")
+        Threshold = titik tengah median clarity kedua kelas.
+
+        Return: dict {threshold, clear_median, hazy_median, accuracy}
+        """
+        clarity = {"Clear & Bright": [], "Cloudy/Hazy": []}
+        for label in {label for _, label in labelled}:
+            if label not in clarity:
+                raise ValueError(f"Label kalibrasi tidak dikenal: {label}")
+
+        report = self.analyze_oil_photos([path for path, _ in labelled])
+        for (_, label), r in zip(labelled, report):
+            if r["features"] is not None:
+                clarity[label].append(r["features"]["clarity"])
+
+        clear, hazy = np.asarray(clarity["Clear & Bright"]), np.asarray(clarity["Cloudy/Hazy"])
+        if not len(clear) or not len(hazy):
+            raise ValueError("Butuh minimal 1 foto terbaca untuk label Clear & Bright dan Cloudy/Hazy.")
+        clear_median, hazy_median = float(np.median(clear)), float(np.median(hazy))
+        if hazy_median >= clear_median:
+            raise ValueError(f"Clarity tidak memisahkan kelas (median clear {clear_median:.4f} <= "
+                             f"hazy {hazy_median:.4f}); cek latar grid & pencahayaan.")
+
+        threshold = 0.5 * (clear_median + hazy_median)
+        correct = (clear >= threshold).sum() + (hazy < threshold).sum()
+        self.hazy_clarity_min = threshold
+        return {
+            "threshold": threshold,
+            "clear_median": clear_median,
+            "hazy_median": hazy_median,
+            "accuracy": float(correct / (len(clear) + len(hazy))),
+        }
+
+    def analyze_oil_photos(self, photo_paths):
+        """
+        Batch analisa foto sampel oli satu rute inspeksi.
+        Cache di cache_dir, key = hash isi file:
+        - thumbnail (.npy): dipakai ulang saat FEATURE_VERSION naik (tanpa decode foto lagi)
+        - fitur (.json)   : saat rute di-run ulang hanya foto baru yang dihitung
+        Foto yang tidak bisa dibaca/di-decode dilaporkan UNKNOWN (dengan error), foto lain tetap diproses.
+        Foto non Dark/Milky juga UNKNOWN (tanpa error) selama hazy_clarity_min belum dikalibrasi.
+        File cache yang rusak (misal proses mati saat menulis) dianggap miss: dihapus lalu dihitung ulang.
+
+        Return: list dict {path, category, status, iso_note, features, error} (urutan sama dengan input)
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        results = [None] * len(photo_paths)
+        errors = [None] * len(photo_paths)
+        new_idx, new_keys, new_thumbs = [], [], []
+
+        for i, path in enumerate(photo_paths):
+            try:
+                data = Path(path).read_bytes()
+            except OSError as e:
+                errors[i] = f"{type(e).__name__}: {e}"
+                continue
+            thumb_key, feat_key = self._cache_keys(data)
+            results[i] = self._load_cached(f"{feat_key}.json")
+            if results[i] is not None:
+                continue
+            thumb = self._load_cached(f"{thumb_key}.npy")
+            if thumb is None:
+                try:
+                    thumb = self._load_thumbnail(data)
+                except (OSError, ValueError, Image.DecompressionBombError) as e:
+                    errors[i] = f"{type(e).__name__}: {e}"
+                    continue
+                self._write_cached(f"{thumb_key}.npy", lambda f, t=thumb: np.save(f, t))
+            new_idx.append(i)
+            new_keys.append(feat_key)
+            new_thumbs.append(thumb)
+
+        if new_thumbs:
+            batch = np.stack(new_thumbs)
+            for i, key, feats in zip(new_idx, new_keys, self.compute_photo_features(batch)):
+                self._write_cached(f"{key}.json", lambda f, d=json.dumps(feats).encode(): f.write(d))
+                results[i] = feats
+
+        report = []
+        for path, feats, error in zip(photo_paths, results, errors):
+            category = self.classify_oil_photo(feats) if feats is not None else "UNKNOWN"
+            status, iso_note = self.analyze_oil_condition(category)
+            report.append({
+                "path": str(path),
+                "category": category,
+                "status": status,
+                "iso_note": iso_note,
+                "features": feats,
+                "error": error,
+            })
+        return report
+
+    def _load_cached(self, name):
+        """Baca entri cache (.json -> dict fitur, .npy -> thumbnail). Tidak ada / rusak -> None."""
+        file = self.cache_dir / name
+        if not file.exists(): return None
+        try:
+            if file.suffix == ".npy":
+                value = np.load(file, allow_pickle=False)
+                if value.shape != (self.thumb_size[1], self.thumb_size[0], 3) or value.dtype != np.uint8:
+                    raise ValueError(f"thumbnail {value.shape} {value.dtype}")
+                return value
+            value = json.loads(file.read_text())
+            if not isinstance(value, dict):
+                raise ValueError("fitur bukan dict")
+            return value
+        except (OSError, ValueError, EOFError):
+            file.unlink(missing_ok=True)
+            return None
+
+    def _write_cached(self, name, write):
+        """
+        Tulis atomik: file sementara di cache_dir lalu os.replace (pembaca tidak pernah lihat file setengah jadi).
+        Gagal tulis (disk penuh / read-only) hanya berarti tidak ter-cache, hasil analisa tetap dipakai.
+        """
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, self.cache_dir / name)
+        except OSError:
+            if tmp is not None:
+                Path(tmp).unlink(missing_ok=True)
+
+    def _cache_keys(self, data):
+        """
+        Key thumbnail = hash isi foto + parameter preprocessing.
+        Key fitur     = key thumbnail + versi fitur.
+        """
+        h = hashlib.sha256(data)
+        h.update(f"{self.thumb_size}|{self.center_crop}".encode())
+        thumb_key = h.hexdigest()
+        return thumb_key, hashlib.sha256(f"{thumb_key}|v{self.FEATURE_VERSION}".encode()).hexdigest()
+
     def analyze_safety(self, checks):
         """
         checks: Dict of boolean
@@ -0,0 +1,231 @@
+# modules/reading_store.py
+"""
+Format penyimpanan biner ringkas untuk pembacaan periodik per aset.
+
+Layout file:
+    HEADER : magic 'BPRD' | versi (u1) | panjang nama channel (u2) | nama channel (ASCII, dipisah koma)
+    BLOCK  : n_rows (u4) | base_ts ms (i8) | deadband_mask (u8)
+             delta timestamp ms (u4 x n_rows, baris pertama = 0)
+             per channel (urut header):
+               - biasa    : float32 x n_rows
+               - deadband : count (u4) | index baris (u2 x count) | float32 x count
+
+Writer & reader sama-sama streaming (per blok), decode langsung ke NumPy structured array
+(READING_DTYPE) tanpa objek Python per baris.
+"""
+
+import struct
+
+import numpy as np
+
+# Urutan channel = key input di render_mechanical_page() + elektrikal + proses
+SIDE_CHANNELS = ["v_de", "v_nde", "a_de", "a_nde", "d_de", "d_nde", "t_de", "t_nde"]
+CHANNELS = (
+    [f"m_{c}" for c in SIDE_CHANNELS]          # Driver (Motor)
+    + [f"p_{c}" for c in SIDE_CHANNELS]        # Driven (Pump)
+    + ["v_rs", "v_st", "v_tr"]                 # Voltage (V)
+    + ["i_r", "i_s", "i_t"]                    # Current (A)
+    + ["suction", "discharge", "flow"]         # BarG, BarG, m3/h
+)
+
+# Contoh deadband untuk channel yang berubah lambat (satuan channel, °C)
+TEMP_DEADBAND = {"m_t_de": 0.5, "m_t_nde": 0.5, "p_t_de": 0.5, "p_t_nde": 0.5}
+
+MAGIC = b"BPRD"
+VERSION = 1
+_HEADER = struct.Struct("<4sBH")
+_BLOCK = struct.Struct("<IqQ")
+_COUNT = struct.Struct("<I")
+MAX_BLOCK_ROWS = 0xFFFF     # Index baris deadband disimpan u2
+MAX_DELTA_MS = 0xFFFFFFFF   # Delta timestamp disimpan u4 (~49 hari)
+
+
+def reading_dtype(channels=CHANNELS):
+    """Structured dtype satu pembacaan: ts (epoch ms) + float32 per channel."""
+    return np.dtype([("ts", "<i8")] + [(c, "<f4") for c in channels])
+
+READING_DTYPE = reading_dtype()
+
+
+def _to_ms(timestamp):
+    """datetime / pandas.Timestamp / epoch detik -> epoch milidetik."""
+    if hasattr(timestamp, "timestamp"):
+        timestamp = timestamp.timestamp()
+    return int(round(float(timestamp) * 1000))
+
+
+def swinging_door(t, v, deviation):
+    """
+    Kompresi Swinging Door Trending (SDT).
+    Return (index, nilai) titik yang disimpan. Interpolasi linear antar titik simpan
+    mereproduksi semua titik asli dengan error <= deviation. Nilai titik simpan
+    diambil di garis "pintu" (bukan nilai mentah) agar batas error tetap terjamin.
+    t harus naik tegas (strictly increasing).
+    """
+    n = len(v)
+    t = np.asarray(t, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+    if n <= 2:
+        return np.arange(n), v.copy()
+
+    keep_idx, keep_val = [0], [v[0]]
+    t0, v0 = t[0], v[0]
+    lo, hi = -np.inf, np.inf
+    for i in range(1, n):
+        dt = t[i] - t0
+        new_lo = max(lo, (v[i] - v0 - deviation) / dt)
+        new_hi = min(hi, (v[i] - v0 + deviation) / dt)
+        if new_lo > new_hi:
+            # Pintu tertutup: arsipkan titik i-1 di garis yang masih valid
+            slope = min(max((v[i - 1] - v0) / (t[i - 1] - t0), lo), hi)
+            t0, v0 = t[i - 1], v0 + slope * (t[i - 1] - t0)
+            keep_idx.append(i - 1)
+            keep_val.append(v0)
+            dt = t[i] - t0
+            new_lo = (v[i] - v0 - deviation) / dt
+            new_hi = (v[i] - v0 + deviation) / dt
+        lo, hi = new_lo, new_hi
+
+    slope = min(max((v[-1] - v0) / (t[-1] - t0), lo), hi)
+    keep_idx.append(n - 1)
+    keep_val.append(v0 + slope * (t[-1] - t0))
+    return np.asarray(keep_idx), np.asarray(keep_val)
+
+
+class ReadingWriter:
+    """
+    Streaming writer. Baris di-buffer lalu ditulis per blok (block_size baris).
+
+    deadband: dict {channel: deviasi} untuk kompresi SDT, misal TEMP_DEADBAND.
+    Channel deadband hanya dikompres di blok yang timestamp-nya naik tegas dan tanpa NaN.
+    """
+
+    def __init__(self, fileobj, channels=CHANNELS, deadband=None, block_size=4096):
+        if len(channels) > 64:
+            raise ValueError("Maksimal 64 channel per file.")
+        if not 0 < block_size <= MAX_BLOCK_ROWS:
+            raise ValueError(f"block_size harus 1..{MAX_BLOCK_ROWS}.")
+        unknown = set(deadband or {}) - set(channels)
+        if unknown:
+            raise ValueError(f"Channel deadband tidak dikenal: {sorted(unknown)}")
+
+        self._f = fileobj
+        self.channels = list(channels)
+        self.deadband = dict(deadband or {})
+        self.block_size = block_size
+        self._index = {c: i for i, c in enumerate(self.channels)}
+        self._ts = []
+        self._rows = []
+
+        names = ",".join(self.channels).encode("ascii")
+        self._f.write(_HEADER.pack(MAGIC, VERSION, len(names)) + names)
+
+    def write(self, timestamp, values):
+        """
+        timestamp: datetime atau epoch detik
+        values   : dict {channel: nilai} (channel hilang = NaN) atau sequence urut channels
+        """
+        ts = _to_ms(timestamp)
+        if self._ts:
+            delta = ts - self._ts[-1]
+            if len(self._ts) >= self.block_size or not 0 <= delta <= MAX_DELTA_MS:
+                self.flush()
+
+        if isinstance(values, dict):
+            row = [np.nan] * len(self.channels)
+            for name, val in values.items():
+                row[self._index[name]] = val
+        else:
+            row = list(values)
+            if len(row) != len(self.channels):
+                raise ValueError(f"Butuh {len(self.channels)} nilai, dapat {len(row)}.")
+
+        self._ts.append(ts)
+        self._rows.append(row)
+
+    def flush(self):
+        """Tulis baris yang ter-buffer sebagai satu blok."""
+        if not self._ts: return
+        ts = np.asarray(self._ts, dtype=np.int64)
+        vals = np.asarray(self._rows, dtype=np.float32)
+        deltas = np.diff(ts, prepend=ts[0]).astype("<u4")
+        strictly_increasing = bool(np.all(np.diff(ts) > 0))
+
+        mask = 0
+        parts = [None, deltas.tobytes()]
+        for i, name in enumerate(self.channels):
+            col = vals[:, i]
+            if name in self.deadband and strictly_increasing and np.isfinite(col).all():
+                idx, kept = swinging_door(ts, col, self.deadband[name])
+                mask |= 1 << i
+                parts += [_COUNT.pack(len(idx)), idx.astype("<u2").tobytes(), kept.astype("<f4").tobytes()]
+            else:
+                parts.append(col.astype("<f4").tobytes())
+        parts[0] = _BLOCK.pack(len(ts), int(ts[0]), mask)
+
+        self._f.write(b"".join(parts))
+        self._ts = []
+        self._rows = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _read_exact(fileobj, size):
+    data = fileobj.read(size)
+    if len(data) != size:
+        raise ValueError("File pembacaan terpotong (truncated).")
+    return data
+
+
+def read_header(fileobj):
+    """Baca header file -> list nama channel."""
+    magic, version, name_len = _HEADER.unpack(_read_exact(fileobj, _HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("Bukan file pembacaan BPRD.")
+    if version != VERSION:
+        raise ValueError(f"Versi file {version} tidak didukung.")
+    return _read_exact(fileobj, name_len).decode("ascii").split(",")
+
+
+def _iter_body(fileobj, channels):
+    dtype = reading_dtype(channels)
+    while True:
+        head = fileobj.read(_BLOCK.size)
+        if not head: return
+        if len(head) != _BLOCK.size:
+            raise ValueError("File pembacaan terpotong (truncated).")
+        n_rows, base_ts, mask = _BLOCK.unpack(head)
+
+        out = np.empty(n_rows, dtype=dtype)
+        deltas = np.frombuffer(_read_exact(fileobj, 4 * n_rows), dtype="<u4")
+        out["ts"] = base_ts + np.cumsum(deltas, dtype=np.int64)
+        for i, name in enumerate(channels):
+            if mask >> i & 1:
+                (count,) = _COUNT.unpack(_read_exact(fileobj, _COUNT.size))
+                idx = np.frombuffer(_read_exact(fileobj, 2 * count), dtype="<u2")
+                kept = np.frombuffer(_read_exact(fileobj, 4 * count), dtype="<f4")
+                out[name] = np.interp(out["ts"], out["ts"][idx], kept)
+            else:
+                out[name] = np.frombuffer(_read_exact(fileobj, 4 * n_rows), dtype="<f4")
+        yield out
+
+
+def iter_blocks(fileobj):
+    """Streaming reader: yield structured array (reading_dtype) per blok."""
+    yield from _iter_body(fileobj, read_header(fileobj))
+
+
+def read_readings(fileobj):
+    """Bulk decode seluruh file -> satu structured array (kolom siap dipakai fungsi analisa)."""
+    channels = read_header(fileobj)
+    blocks = list(_iter_body(fileobj, channels))
+    if not blocks:
+        return np.empty(0, dtype=reading_dtype(channels))
+    return np.concatenate(blocks)